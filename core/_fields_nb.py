@@ -0,0 +1,38 @@
+import numpy as np
+from numba import njit, prange
+
+@njit(cache=True, parallel=True)
+def compute_field_fused(d_obs, obs_mask, goal_r, goal_c, k_att, k_rep, rho_0, out):
+    """
+    Attractive + repulsive potential in a single pass over the grid.
+    Reads each obstacle distance once and writes each output cell once; the goal
+    distance is computed on the fly instead of being materialized as an array.
+
+    Args:
+        d_obs (ndarray): Distance from each cell to its nearest obstacle.
+        obs_mask (ndarray): True where the cell is an obstacle (written as inf).
+        out (ndarray): 2D output array (float32), filled in place.
+    """
+    rows, cols = out.shape
+    inv_rho = 1.0 / rho_0
+
+    for r in prange(rows):
+        dr = r - goal_r
+        for c in range(cols):
+            if obs_mask[r, c]:
+                out[r, c] = np.inf
+                continue
+
+            # Linear attraction to goal (Conic well)
+            dc = c - goal_c
+            u = k_att * np.sqrt(dr * dr + dc * dc)
+
+            # Standard Khatib repulsive potential (distance clamped to avoid division by zero)
+            d = d_obs[r, c]
+            if d <= rho_0:
+                if d < 0.1:
+                    d = 0.1
+                t = 1.0 / d - inv_rho
+                u += 0.5 * k_rep * t * t
+
+            out[r, c] = u
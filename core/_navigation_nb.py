@@ -0,0 +1,190 @@
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def descend(padded, obstacles, start_r, start_c, goal_r, goal_c, max_steps, max_stale, beta, seed):
+    """
+    Headless gradient descent with random-walk recovery, same rules as
+    GradientDescentNavigator.plan.
+
+    Args:
+        padded (ndarray): float32 potential field with a 1-cell +inf border.
+        obstacles (ndarray): uint8 grid, 1 = obstacle (used by the random walk).
+        max_stale (int): Stop after this many moves without getting closer to the goal.
+        beta (float): Recovery bias towards lower potential (0 = uniform random walk).
+        seed (int): Seed for the recovery random walk.
+
+    Returns:
+        (path, nodes_visited, success) where path is an int32 (n, 2) array.
+    """
+    np.random.seed(seed)
+    rows, cols = obstacles.shape
+    path = np.empty((max_steps + 1, 2), dtype=np.int32)
+    path[0, 0] = start_r
+    path[0, 1] = start_c
+    count = 1
+
+    # Last 4 positions as r * cols + c keys (-1 = empty slot)
+    history = np.full(4, -1, dtype=np.int64)
+    hist_idx = 0
+
+    r = start_r
+    c = start_c
+    recovery_steps_left = 0
+    success = False
+    # Closest squared distance to the goal so far, and moves since it last improved
+    best_d = (r - goal_r) ** 2 + (c - goal_c) ** 2
+    stale = 0
+    cand_r = np.empty(4, dtype=np.int64)
+    cand_c = np.empty(4, dtype=np.int64)
+    cand_w = np.empty(4, dtype=np.float64)
+
+    for _ in range(max_steps):
+        if r == goal_r and c == goal_c:
+            success = True
+            break
+
+        if recovery_steps_left > 0:
+            # --- RECOVERY MODE (One Random Step, 4-connected) ---
+            if beta > 0.0:
+                # Biased step: softmax over -beta * potential of the free neighbours
+                n = 0
+                v_min = np.inf
+                for k in range(4):
+                    nr = r + (-1, 1, 0, 0)[k]
+                    nc = c + (0, 0, -1, 1)[k]
+                    if 0 <= nr < rows and 0 <= nc < cols and obstacles[nr, nc] != 1:
+                        cand_r[n] = nr
+                        cand_c[n] = nc
+                        cand_w[n] = padded[nr + 1, nc + 1]
+                        v_min = min(v_min, cand_w[n])
+                        n += 1
+                if n > 0:
+                    total = 0.0
+                    for k in range(n):
+                        # exp(-inf) = 0; an all-inf neighbourhood falls back to uniform
+                        cand_w[k] = np.exp(-beta * (cand_w[k] - v_min)) if v_min < np.inf else 1.0
+                        total += cand_w[k]
+                    u = np.random.random() * total
+                    k = 0
+                    acc = cand_w[0]
+                    while acc < u and k < n - 1:
+                        k += 1
+                        acc += cand_w[k]
+                    r = cand_r[k]
+                    c = cand_c[k]
+            else:
+                # Uniform step: rejection sampling first; exhaustive pick if 8 draws all miss
+                moved = False
+                for _ in range(8):
+                    k = np.random.randint(0, 4)
+                    nr = r + (-1, 1, 0, 0)[k]
+                    nc = c + (0, 0, -1, 1)[k]
+                    if 0 <= nr < rows and 0 <= nc < cols and obstacles[nr, nc] != 1:
+                        r = nr
+                        c = nc
+                        moved = True
+                        break
+                if not moved:
+                    n = 0
+                    for k in range(4):
+                        nr = r + (-1, 1, 0, 0)[k]
+                        nc = c + (0, 0, -1, 1)[k]
+                        if 0 <= nr < rows and 0 <= nc < cols and obstacles[nr, nc] != 1:
+                            cand_r[n] = nr
+                            cand_c[n] = nc
+                            n += 1
+                    if n > 0:
+                        k = np.random.randint(0, n)
+                        r = cand_r[k]
+                        c = cand_c[k]
+            recovery_steps_left -= 1
+        else:
+            # --- NORMAL MODE (lowest of the 8 neighbours, strictly below here) ---
+            # 3x3 block of the padded field around (r, c), loaded as 9 scalars
+            v0 = padded[r, c]
+            v1 = padded[r, c + 1]
+            v2 = padded[r, c + 2]
+            v3 = padded[r + 1, c]
+            v4 = padded[r + 1, c + 1]
+            v5 = padded[r + 1, c + 2]
+            v6 = padded[r + 2, c]
+            v7 = padded[r + 2, c + 1]
+            v8 = padded[r + 2, c + 2]
+
+            # Row-major scan with strict '<', so the first of equal minima wins
+            best_val = v4
+            best_k = 4
+            if v0 < best_val:
+                best_val = v0
+                best_k = 0
+            if v1 < best_val:
+                best_val = v1
+                best_k = 1
+            if v2 < best_val:
+                best_val = v2
+                best_k = 2
+            if v3 < best_val:
+                best_val = v3
+                best_k = 3
+            if v5 < best_val:
+                best_val = v5
+                best_k = 5
+            if v6 < best_val:
+                best_val = v6
+                best_k = 6
+            if v7 < best_val:
+                best_val = v7
+                best_k = 7
+            if v8 < best_val:
+                best_val = v8
+                best_k = 8
+            best_r = r + best_k // 3 - 1
+            best_c = c + best_k % 3 - 1
+
+            # Check if stuck (flat minimum, obstacle, or oscillating)
+            stuck = (best_r == r and best_c == c) or not np.isfinite(best_val)
+            if not stuck:
+                key = best_r * cols + best_c
+                for k in range(4):
+                    if history[k] == key:
+                        stuck = True
+            if stuck:
+                recovery_steps_left = 100
+                continue
+            r = best_r
+            c = best_c
+
+        # Execute Move
+        path[count, 0] = r
+        path[count, 1] = c
+        count += 1
+        history[hist_idx & 3] = r * cols + c
+        hist_idx += 1
+
+        # Early exit: no progress towards the goal for max_stale moves
+        d = (r - goal_r) ** 2 + (c - goal_c) ** 2
+        if d < best_d:
+            best_d = d
+            stale = 0
+        else:
+            stale += 1
+            if stale > max_stale:
+                break
+
+    return path[:count].copy(), count - 1, success
+
+_warmed_up = False
+
+def warm_up():
+    """
+    Compiles descend (or loads it from Numba's on-disk cache) with the argument
+    types plan() uses, by running it on a 1x1 map. Only the first call does work.
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    padded = np.full((3, 3), np.inf, dtype=np.float32)
+    padded[1, 1] = 0.0
+    descend(padded, np.zeros((1, 1), dtype=np.uint8), 0, 0, 0, 0, 1, 1, 0.0, 0)
+    _warmed_up = True
@@ -0,0 +1,106 @@
+import numpy as np
+from numba import config, njit, prange, set_num_threads
+
+from core._qlearn_np import Q_INT_MAX, Q_SCALE
+
+@njit(cache=True, inline='always')
+def _quantize(value):
+    """Rounds a float Q-value to its clipped int16 fixed-point code."""
+    v = round(value * Q_SCALE)
+    if v > Q_INT_MAX:
+        v = Q_INT_MAX
+    elif v < -Q_INT_MAX:
+        v = -Q_INT_MAX
+    return np.int16(v)
+
+@njit(cache=True, inline='always')
+def _xorshift(state):
+    """One xorshift64* step. Returns (new_state, 64 random bits)."""
+    state ^= state >> np.uint64(12)
+    state ^= state << np.uint64(25)
+    state ^= state >> np.uint64(27)
+    return state, state * np.uint64(0x2545F4914F6CDD1D)
+
+@njit(cache=True, inline='always')
+def _argmax4(q, m, r, c):
+    """Index of the best of the 4 action values (first one wins ties, like np.argmax)."""
+    a = q[m, r, c, 0]
+    b = q[m, r, c, 1]
+    c2 = q[m, r, c, 2]
+    d = q[m, r, c, 3]
+    ab = 0 if a >= b else 1
+    ab_v = a if a >= b else b
+    cd = 2 if c2 >= d else 3
+    cd_v = c2 if c2 >= d else d
+    return ab if ab_v >= cd_v else cd
+
+@njit(cache=True, inline='always')
+def _max4(q, m, r, c):
+    """Largest of the 4 action values."""
+    a = q[m, r, c, 0]
+    b = q[m, r, c, 1]
+    c2 = q[m, r, c, 2]
+    d = q[m, r, c, 3]
+    ab_v = a if a >= b else b
+    cd_v = c2 if c2 >= d else d
+    return ab_v if ab_v >= cd_v else cd_v
+
+@njit(cache=True, fastmath=True, nogil=True)
+def run_episode(q, next_rc, step_reward, map_idx, start_r, start_c, goal_r, goal_c,
+                eps, lr, gamma, max_steps, seed):
+    """
+    Runs a single epsilon-greedy Q-learning episode on one map.
+    The Q-table is updated in place; nothing is returned.
+
+    Args:
+        q (ndarray): int16 fixed-point Q-table of shape (maps, rows, cols, 4).
+        next_rc, step_reward (ndarray): Environment lookup tables from build_transitions.
+        map_idx (int): Index of the map being trained.
+        seed (uint64): Non-zero seed for this episode's register-local PRNG.
+    """
+    r = start_r
+    c = start_c
+    state = np.uint64(seed)
+
+    for _ in range(max_steps):
+        # Epsilon-greedy action selection (top 53 bits -> [0, 1), top 2 bits -> action)
+        state, bits = _xorshift(state)
+        if (bits >> np.uint64(11)) * (1.0 / 9007199254740992.0) < eps:
+            state, bits = _xorshift(state)
+            action_idx = np.int64(bits >> np.uint64(62))
+        else:
+            action_idx = _argmax4(q, map_idx, r, c)
+
+        # Environment step: two table loads instead of bounds/wall checks
+        next_r = next_rc[map_idx, r, c, action_idx, 0]
+        next_c = next_rc[map_idx, r, c, action_idx, 1]
+        reward = step_reward[map_idx, r, c, action_idx]
+        done = next_r == goal_r and next_c == goal_c
+
+        # Bellman update (argmax/max work on the int16 codes, the update in float)
+        max_future_q = _max4(q, map_idx, next_r, next_c)
+        current_q = q[map_idx, r, c, action_idx] / Q_SCALE
+        future_q = max_future_q / Q_SCALE
+        q[map_idx, r, c, action_idx] = _quantize(current_q + lr * (reward + gamma * future_q - current_q))
+
+        r = next_r
+        c = next_c
+        if done:
+            break
+
+
+@njit(cache=True, fastmath=True, nogil=True, parallel=True)
+def run_episodes(q, next_rc, step_reward, map_ids, seeds, starts, goals, max_steps, eps, lr, gamma):
+    """
+    Runs one episode per entry of `map_ids` (seeded by `seeds`) with a fixed epsilon.
+    Episodes are spread over Numba's worker threads (prange); they all update `q`
+    in place without locks.
+    """
+    for i in prange(map_ids.shape[0]):
+        m = map_ids[i]
+        run_episode(q, next_rc, step_reward, m, starts[m, 0], starts[m, 1], goals[m, 0], goals[m, 1],
+                    eps, lr, gamma, max_steps[m], seeds[i])
+
+def set_workers(n_workers):
+    """Caps the number of threads run_episodes uses (at most Numba's configured pool)."""
+    set_num_threads(max(1, min(n_workers, config.NUMBA_NUM_THREADS)))
@@ -0,0 +1,99 @@
+import numpy as np
+
+# Cell value used for walls in the stacked grids
+OBSTACLE = 1
+
+# Q-values are stored as int16 fixed point: q_int = round(q * Q_SCALE).
+# The goal (+1000) is terminal and walls cost -10/step, so |Q| <= 1000 < 32767 / Q_SCALE.
+Q_SCALE = 32.0
+Q_INT_MAX = 32767
+
+def to_fixed_point(q_float):
+    """Converts a float Q-table (e.g. an old brain file) to the int16 representation."""
+    q = np.rint(np.asarray(q_float, dtype=np.float64) * Q_SCALE)
+    return np.clip(q, -Q_INT_MAX, Q_INT_MAX).astype(np.int16)
+
+def build_transitions(grids, shapes, goals, dr, dc):
+    """
+    Precomputes the environment model for every (map, row, col, action).
+    The stacked grids are padded with walls, so leaving a map behaves like hitting a wall.
+    Padding cells themselves (row >= rows or col >= cols of their map) are self-loops
+    with a -10 reward, so the table is closed over the whole padded shape and the
+    kernels never need to know the real size of a map.
+
+    Args:
+        dr, dc (ndarray): int8 row/col delta of each action.
+
+    Returns:
+        next_rc (ndarray): int16 (maps, rows, cols, actions, 2) next cell (self-loop if blocked).
+        step_reward (ndarray): float32 (maps, rows, cols, actions) reward for taking the action.
+    """
+    num_maps, rows, cols = grids.shape
+    rr, cc = np.indices((rows, cols))
+    rr = rr[..., None]
+    cc = cc[..., None]
+    padding = (rr >= shapes[:, 0, None, None, None]) | (cc >= shapes[:, 1, None, None, None])
+
+    # Every action at once: (rows, cols, actions)
+    nr = rr + dr
+    nc = cc + dc
+    inside = (nr >= 0) & (nr < rows) & (nc >= 0) & (nc < cols)
+
+    # Bounds + Walls (+ padding cells never leave): (maps, rows, cols, actions)
+    blocked = ~inside | (grids[:, np.clip(nr, 0, rows - 1), np.clip(nc, 0, cols - 1)] == OBSTACLE) | padding
+    next_r = np.where(blocked, rr, nr)
+    next_c = np.where(blocked, cc, nc)
+    next_rc = np.stack((next_r, next_c), axis=-1).astype(np.int16)
+
+    # Standard step penalty, -10 for crashing, big reward for the goal
+    step_reward = np.where(blocked, -10.0, -1.0).astype(np.float32)
+    reaches_goal = (next_r == goals[:, 0, None, None, None]) & (next_c == goals[:, 1, None, None, None])
+    step_reward[~blocked & reaches_goal] = 1000.0
+
+    return next_rc, step_reward
+
+def run_batch(q, next_rc, step_reward, map_idx, start, goal, n_agents,
+              max_steps, eps, lr, gamma, rng):
+    """
+    Rolls out `n_agents` epsilon-greedy episodes on one map side by side.
+    Each step is a handful of NumPy ops over the agents that are still running.
+    The Q-table is updated in place; nothing is returned.
+
+    Args:
+        q (ndarray): int16 fixed-point Q-table of shape (maps, rows, cols, 4).
+        next_rc, step_reward (ndarray): Environment lookup tables from build_transitions.
+        map_idx (int): Index of the map being trained.
+        n_agents (int): Number of parallel episodes (vector length).
+        rng (np.random.Generator): Source of the per-step random vectors.
+    """
+    q_map = q[map_idx]
+    next_map = next_rc[map_idx]
+    reward_map = step_reward[map_idx]
+    goal_r, goal_c = goal
+
+    r = np.full(n_agents, start[0], dtype=np.intp)
+    c = np.full(n_agents, start[1], dtype=np.intp)
+
+    for _ in range(max_steps):
+        n = len(r)
+
+        # Epsilon-greedy action selection for every lane at once
+        explore = rng.random(n) < eps
+        a = np.where(explore, rng.integers(0, 4, size=n), q_map[r, c].argmax(axis=1))
+
+        # Environment step from the lookup tables
+        next_r = next_map[r, c, a, 0].astype(np.intp)
+        next_c = next_map[r, c, a, 1].astype(np.intp)
+        reward = reward_map[r, c, a]
+
+        # Bellman update (float math, stored back as int16 codes)
+        current_q = q_map[r, c, a] / Q_SCALE
+        future_q = q_map[next_r, next_c].max(axis=1) / Q_SCALE
+        q_map[r, c, a] = to_fixed_point(current_q + lr * (reward + gamma * future_q - current_q))
+
+        # Lanes that reached the goal drop out
+        running = (next_r != goal_r) | (next_c != goal_c)
+        r = next_r[running]
+        c = next_c[running]
+        if len(r) == 0:
+            break
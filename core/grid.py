@@ -1,4 +1,6 @@
 import os
+import numpy as np
+from scipy.ndimage import binary_dilation
 
 # Constants for map parsing
 FREE = 0
@@ -16,8 +18,8 @@ class OccupancyGrid:
             robot_width (int): Width of the robot in cells.
             robot_height (int): Height of the robot in cells.
         """
-        self.original_grid = []
-        self.grid = []  # This will be the inflated grid (Configuration Space)
+        self.original_grid = None
+        self.grid = None  # This will be the inflated grid (Configuration Space)
         self.rows = 0
         self.cols = 0
         self.start_pos = None  # (row, col)
@@ -32,20 +34,21 @@ class OccupancyGrid:
         self._inflate_obstacles()
 
     def _load_map(self, filename):
-        """Parses the text file into a 2D array."""
+        """Parses the text file into a 2D uint8 NumPy array."""
         if not os.path.exists(filename):
             raise FileNotFoundError(f"Map file not found: {filename}")
 
         with open(filename, 'r') as f:
             lines = f.readlines()
 
+        parsed_rows = []
         for r, line in enumerate(lines):
             # Parse integers from the line
             row_data = [int(x) for x in line.strip().split()]
             if not row_data:
                 continue
             
-            self.original_grid.append(row_data)
+            parsed_rows.append(row_data)
             
             # Locate Start and Goal
             for c, cell_val in enumerate(row_data):
@@ -54,15 +57,15 @@ class OccupancyGrid:
                 elif cell_val == GOAL:
                     self.goal_pos = (r, c)
 
-        if not self.original_grid:
+        if not parsed_rows:
             raise ValueError("Map file is empty or invalid.")
 
-        self.rows = len(self.original_grid)
-        self.cols = len(self.original_grid[0])
+        # One contiguous buffer instead of a list of lists
+        self.original_grid = np.asarray(parsed_rows, dtype=np.uint8)
+        self.rows, self.cols = self.original_grid.shape
         
         # Initialize the working grid as a copy of the original
-        # We use list comprehension for a deep copy of rows
-        self.grid = [row[:] for row in self.original_grid]
+        self.grid = self.original_grid.copy()
 
     def _inflate_obstacles(self):
         """
@@ -78,33 +81,19 @@ class OccupancyGrid:
         margin_row = (self.robot_h - 1) // 2
         margin_col = (self.robot_w - 1) // 2
 
-        # Find all original obstacles
-        obstacle_coords = []
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.original_grid[r][c] == OBSTACLE:
-                    obstacle_coords.append((r, c))
+        # Dilate the original obstacles by the robot footprint in a single C call
+        obstacle_mask = (self.original_grid == OBSTACLE)
+        footprint = np.ones((2 * margin_row + 1, 2 * margin_col + 1), dtype=bool)
+        inflated = binary_dilation(obstacle_mask, structure=footprint)
 
-        # Apply inflation
-        for r_obs, c_obs in obstacle_coords:
-            # Iterate through the footprint around the obstacle
-            for r_delta in range(-margin_row, margin_row + 1):
-                for c_delta in range(-margin_col, margin_col + 1):
-                    
-                    new_r = r_obs + r_delta
-                    new_c = c_obs + c_delta
-
-                    # Boundary check
-                    if 0 <= new_r < self.rows and 0 <= new_c < self.cols:
-                        # Don't overwrite Start or Goal, only Free space
-                        if self.grid[new_r][new_c] == FREE:
-                            self.grid[new_r][new_c] = OBSTACLE
+        # Don't overwrite Start or Goal, only Free space
+        self.grid[inflated & (self.original_grid == FREE)] = OBSTACLE
 
     def is_valid(self, row, col):
         """Check if a coordinate is within bounds and not an obstacle."""
         if 0 <= row < self.rows and 0 <= col < self.cols:
-            return self.grid[row][col] != OBSTACLE
+            return bool(self.grid[row, col] != OBSTACLE)
         return False
 
     def get_cell(self, row, col):
-        return self.grid[row][col]
\ No newline at end of file
+        return self.grid[row, col]
\ No newline at end of file
@@ -1,15 +1,39 @@
+import math
 import random
 import time
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
+from collections import deque
 import numpy as np
 
+from utils.field_prep import prep_heatmap
+
+try:
+    from core._navigation_nb import descend, warm_up
+except ImportError:  # Numba not installed: headless runs use the Python loop below
+    descend = warm_up = None
+
+# 4-connectivity for the recovery random walk
+MOVES4 = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
 class GradientDescentNavigator:
     def __init__(self, grid):
         self.grid = grid
         self.max_steps = 15000
+        # Give up after this many moves without getting closer to the goal (None = never).
+        # Off by default: maze-like maps often need long detours away from the goal.
+        self.max_stale_steps = None
+        # Recovery-walk bias towards lower potential: softmax over -beta * neighbour potential.
+        # 0 = uniform walk (default); a positive beta tends to keep the walk inside the basin
+        # it is trying to escape, so raise it only for maps without deep local minima.
+        self.recovery_beta = 0.0
         self.path = []
         
+        # Per-field arrays reused across plan() calls on the same field object
+        self._field_src = None
+        self._field = None
+        self._padded = None
+        self._obstacles = None
+        self._next_step = None
+        
         # Statistics
         self.planning_time = 0.0
         self.nodes_visited = 0
@@ -20,41 +44,59 @@ class GradientDescentNavigator:
         Executes Gradient Descent with optional Live Visualization.
         Refactored to show Recovery steps individually.
         """
-        self.path = [start]
         self.nodes_visited = 0
         self.success = False
+        headless = descend is not None and not live_view
+        if headless:
+            # Compile the kernel (once per process) before the clock starts, so
+            # JIT/cache-load time never lands in planning_time
+            warm_up()
+        
+        start_ns = time.perf_counter_ns()  # monotonic, ns resolution
+        # Replanning on the same field object skips the O(rows * cols) setup
+        if potential_field is not self._field_src:
+            self._prepare_field(potential_field)
+        field = self._field
+        obstacles = self._obstacles
+        # A stale window of max_steps can never trigger, i.e. early exit disabled
+        max_stale = self.max_steps if self.max_stale_steps is None else self.max_stale_steps
+        
+        if headless:
+            # Headless: the whole loop runs in compiled code
+            self.path, self.nodes_visited, self.success = descend(
+                self._padded, obstacles, start[0], start[1], goal[0], goal[1],
+                self.max_steps, max_stale, float(self.recovery_beta), random.randrange(2**32)
+            )
+            self.planning_time = (time.perf_counter_ns() - start_ns) / 1e6
+            return self.path
         
-        start_time = time.time()
         current_pos = start
-        recent_history = [] 
+        # Tuples appended in the loop, turned into an int32 array once at the end
+        path = [start]
+        cols = field.shape[1]
+        # Last 4 visited cells as flat keys (r * cols + c); appending evicts the oldest
+        recent_history = deque(maxlen=4)
         
         # State variable for recovery mode
         recovery_steps_left = 0
 
         # --- SETUP LIVE PLOT ---
         if live_view:
+            # Imported here so headless planning never loads matplotlib; the backend is
+            # whatever the caller configured (main.py picks an interactive one)
+            import matplotlib.pyplot as plt
+            from matplotlib.patches import Rectangle
+            
             plt.ion()
             fig, ax = plt.subplots(figsize=(8, 8))
             
             # 1. Plot Heatmap
-            field_np = np.array(potential_field, dtype=np.float64)
-            finite_vals = field_np[np.isfinite(field_np)]
-            if len(finite_vals) > 0:
-                max_val = np.max(finite_vals)
-                field_np[np.isinf(field_np)] = max_val
-
-            ax.imshow(field_np, cmap='viridis', origin='upper')
+            ax.imshow(prep_heatmap(field), cmap='viridis', origin='upper')
             
             # 2. Plot Obstacles
-            rows, cols = self.grid.rows, self.grid.cols
-            obs_mask = np.zeros((rows, cols), dtype=np.float64)
-            for r in range(rows):
-                for c in range(cols):
-                    if self.grid.get_cell(r, c) == 1:
-                        obs_mask[r, c] = 1.0
+            obs_mask = (obstacles == 1).astype(np.float64)
             
-            alpha_mask = np.where(obs_mask == 1.0, 1.0, 0.0).astype(np.float64)
-            ax.imshow(obs_mask, cmap='Greys', alpha=alpha_mask, origin='upper')
+            ax.imshow(obs_mask, cmap='Greys', alpha=obs_mask, origin='upper')
 
             # 3. Plot Start/Goal
             ax.scatter(start[1], start[0], c='lime', s=100, edgecolors='black', label='Start')
@@ -69,15 +111,36 @@ class GradientDescentNavigator:
             
             robot_rect = Rectangle(
                 (start_x, start_y), robo_w, robo_h, 
-                linewidth=1, edgecolor='black', facecolor='red', alpha=0.8, label='Robot'
+                linewidth=1, edgecolor='black', facecolor='red', alpha=0.8, label='Robot',
+                animated=True
             )
             ax.add_patch(robot_rect)
-            path_line, = ax.plot([], [], 'r-', linewidth=1, alpha=0.5)
+            path_line, = ax.plot([], [], 'r-', linewidth=1, alpha=0.5, animated=True)
+            path_x, path_y = [start[1]], [start[0]]
             
             # Dynamic Title
-            title_text = ax.set_title(f"Live Navigation (Mode: Gradient Descent)")
+            title_text = ax.set_title(f"Live Navigation (Mode: Gradient Descent)", animated=True)
             ax.legend(loc='upper right')
             plt.show()
+            
+            # Blitting as in UniversalQLearningAgent.run_demo; the whole figure is cached since the
+            # title (updated per step) sits outside the axes
+            fig.canvas.draw()
+            background = fig.canvas.copy_from_bbox(fig.bbox)
+
+        # Hot-loop names bound as locals (LOAD_FAST instead of attribute lookups)
+        INF = float('inf')
+        goal_r, goal_c = goal
+        # No-progress early exit, same rule as descend()
+        best_d = (start[0] - goal_r) ** 2 + (start[1] - goal_c) ** 2
+        stale = 0
+        if self._next_step is None:
+            self._next_step = self._build_next_step()
+        next_step = self._next_step
+        is_osc = self._is_oscillating
+        rand_neighbor = self._get_biased_neighbor if self.recovery_beta > 0 else self._get_random_neighbor
+        remember = recent_history.append
+        record = path.append
 
         # --- MAIN LOOP ---
         for step in range(self.max_steps):
@@ -90,7 +153,7 @@ class GradientDescentNavigator:
             # DECISION LOGIC: Are we recovering or following gradient?
             if recovery_steps_left > 0:
                 # --- RECOVERY MODE (One Random Step) ---
-                next_pos = self._get_random_neighbor(current_pos)
+                next_pos = rand_neighbor(current_pos, obstacles)
                 recovery_steps_left -= 1
                 
                 if live_view:
@@ -100,12 +163,15 @@ class GradientDescentNavigator:
                 if live_view:
                     title_text.set_text("Live Navigation (Mode: Gradient Descent)")
 
-                best_neighbor = self._get_best_neighbor(current_pos, potential_field)
+                # Follow the precomputed steepest-descent step
+                dr, dc = next_step[current_pos].tolist()
+                best_neighbor = (current_pos[0] + dr, current_pos[1] + dc)
                 
-                # Check if stuck
-                if best_neighbor == current_pos or \
-                   potential_field[best_neighbor[0]][best_neighbor[1]] == float('inf') or \
-                   self._is_oscillating(recent_history, best_neighbor):
+                # Check if stuck: cheap int/float compares first, history scan only if needed
+                stuck = (dr == 0 and dc == 0) or field[best_neighbor] == INF
+                if not stuck:
+                    stuck = is_osc(recent_history, best_neighbor[0] * cols + best_neighbor[1])
+                if stuck:
                     
                     # TRIGGER RECOVERY
                     recovery_steps_left = 100  # Set counter
@@ -115,72 +181,140 @@ class GradientDescentNavigator:
 
             # Execute Move
             current_pos = next_pos
-            self.path.append(current_pos)
-            self.nodes_visited += 1
+            record(current_pos)
+            
+            remember(current_pos[0] * cols + current_pos[1])
             
-            recent_history.append(current_pos)
-            if len(recent_history) > 4:
-                recent_history.pop(0)
+            d = (current_pos[0] - goal_r) ** 2 + (current_pos[1] - goal_c) ** 2
+            if d < best_d:
+                best_d = d
+                stale = 0
+            else:
+                stale += 1
+                if stale > max_stale:
+                    break
 
-            # --- UPDATE LIVE PLOT (Happens every single step now) ---
+            # --- UPDATE LIVE PLOT (every 5th step) ---
             if live_view:
-                path_rows, path_cols = zip(*self.path)
-                path_line.set_data(path_cols, path_rows)
-                
-                new_x = current_pos[1] - robo_w / 2
-                new_y = current_pos[0] - robo_h / 2
-                robot_rect.set_xy((new_x, new_y))
-                
-                fig.canvas.draw()
-                fig.canvas.flush_events()
-                
-                # Fast update for smooth animation
-                time.sleep(0.005)
+                path_x.append(current_pos[1])
+                path_y.append(current_pos[0])
+                if step % 5 == 0:
+                    path_line.set_data(path_x, path_y)
+                    
+                    new_x = current_pos[1] - robo_w / 2
+                    new_y = current_pos[0] - robo_h / 2
+                    robot_rect.set_xy((new_x, new_y))
+                    
+                    fig.canvas.restore_region(background)
+                    ax.draw_artist(path_line)
+                    ax.draw_artist(robot_rect)
+                    ax.draw_artist(title_text)
+                    fig.canvas.blit(fig.bbox)
+                    fig.canvas.flush_events()
+                    
+                    # Fast update for smooth animation
+                    time.sleep(0.005)
 
-        end_time = time.time()
-        self.planning_time = (end_time - start_time) * 1000
+        self.planning_time = (time.perf_counter_ns() - start_ns) / 1e6
+        # Same (n, 2) int32 array that descend returns
+        self.path = np.asarray(path, dtype=np.int32)
+        self.nodes_visited = len(path) - 1
         
         if live_view:
+            # Final frame: draw the full path and un-animate (see run_demo)
+            path_line.set_data(self.path[:, 1], self.path[:, 0])
+            robot_rect.set_xy((current_pos[1] - robo_w / 2, current_pos[0] - robo_h / 2))
+            for artist in (path_line, robot_rect, title_text):
+                artist.set_animated(False)
             plt.ioff()
             print("Finished! Close the visualization window to exit.")
             plt.show()
 
         return self.path
 
-    def _get_best_neighbor(self, pos, field):
-        r, c = pos
-        rows = len(field)
-        cols = len(field[0])
-        best_pos = pos
-        min_val = field[r][c]
+    def _prepare_field(self, potential_field):
+        """
+        Builds the per-field arrays used by plan() and remembers which field they belong to.
+        The field is assumed not to be modified in place between plans.
+        """
+        # Contiguous float32 copy of the field, reused for every lookup
+        field = np.ascontiguousarray(np.asarray(potential_field, dtype=np.float32))
+        # +inf border so every 3x3 neighbourhood is a plain slice (no bounds checks)
+        padded = np.full((field.shape[0] + 2, field.shape[1] + 2), np.inf, dtype=np.float32)
+        padded[1:-1, 1:-1] = field
         
-        moves = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+        self._field = field
+        self._padded = padded
+        # uint8 obstacle mask (1 = obstacle), shared by the random walk and the live view
+        self._obstacles = np.ascontiguousarray(self.grid.grid, dtype=np.uint8)
+        self._next_step = None  # built on first use by the Python loop
+        # Holding a reference (not just id()) so the identity check can't match a recycled id
+        self._field_src = potential_field
+
+    def _build_next_step(self):
+        """
+        Steepest-descent flow field: for every cell, the (dr, dc) step to the 8-connected
+        neighbour with the lowest potential, or (0, 0) if no neighbour is strictly lower.
+        Ties go to the first neighbour in row-major order. Returns an int8 (rows, cols, 2) array.
+        """
+        P = self._padded
+        rows, cols = P.shape[0] - 2, P.shape[1] - 2
+        best_val = P[1:-1, 1:-1].copy()
+        best_k = np.full((rows, cols), 4, dtype=np.int8)  # 4 = centre of the 3x3 block
+        # One whole-field pass per neighbour of the 3x3 block (row-major, strict '<')
+        for k in (0, 1, 2, 3, 5, 6, 7, 8):
+            i, j = divmod(k, 3)
+            shifted = P[i:i + rows, j:j + cols]
+            better = shifted < best_val
+            best_val[better] = shifted[better]
+            best_k[better] = k
+        return np.stack([best_k // 3 - 1, best_k % 3 - 1], axis=-1).astype(np.int8)
+
+    def _get_random_neighbor(self, pos, obstacles):
+        """Returns a single valid random neighbor for recovery (`obstacles`: uint8 mask, 1 = obstacle)."""
+        rows, cols = obstacles.shape
+        r, c = pos
         
-        for dr, dc in moves:
+        # Rejection sampling: usually accepts on the first draw, no lists built
+        for _ in range(8):
+            dr, dc = MOVES4[random.randrange(4)]
             nr, nc = r + dr, c + dc
-            if 0 <= nr < rows and 0 <= nc < cols:
-                val = field[nr][nc]
-                if val < min_val:
-                    min_val = val
-                    best_pos = (nr, nc)
-        return best_pos
-
-    def _get_random_neighbor(self, pos):
-        """Returns a single valid random neighbor for recovery."""
-        rows = self.grid.rows
-        cols = self.grid.cols
-        valid_moves = []
-        moves = [(-1, 0), (1, 0), (0, -1), (0, 1)] # 4-connectivity for random walk
+            if 0 <= nr < rows and 0 <= nc < cols and obstacles[nr, nc] != 1:
+                return (nr, nc)
         
-        for dr, dc in moves:
-            nr, nc = pos[0] + dr, pos[1] + dc
+        # Safety net for (nearly) boxed-in cells
+        valid_moves = []
+        for dr, dc in MOVES4:
+            nr, nc = r + dr, c + dc
             if 0 <= nr < rows and 0 <= nc < cols:
-                if self.grid.get_cell(nr, nc) != 1:
+                if obstacles[nr, nc] != 1:
                     valid_moves.append((nr, nc))
         
         if valid_moves:
             return random.choice(valid_moves)
         return pos # No move possible
 
-    def _is_oscillating(self, history, next_pos):
-        return next_pos in history
\ No newline at end of file
+    def _get_biased_neighbor(self, pos, obstacles):
+        """Like _get_random_neighbor, but neighbours with lower potential are more likely."""
+        rows, cols = obstacles.shape
+        r, c = pos
+        field = self._field
+        candidates = []
+        values = []
+        for dr, dc in MOVES4:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols and obstacles[nr, nc] != 1:
+                candidates.append((nr, nc))
+                values.append(float(field[nr, nc]))
+        
+        if not candidates:
+            return pos # No move possible
+        v_min = min(values)
+        if v_min == float('inf'):
+            return random.choice(candidates)
+        weights = [math.exp(-self.recovery_beta * (v - v_min)) for v in values]
+        return random.choices(candidates, weights)[0]
+
+    def _is_oscillating(self, history, key):
+        """True if the flat cell key is one of the 4 most recently visited cells."""
+        return key in history
\ No newline at end of file
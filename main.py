@@ -67,7 +67,7 @@ def main():
     print("="*40)
     
     if navigator.success:
-        print(f"Path found! Ends at {path[-1]}")
+        print(f"Path found! Ends at {tuple(path[-1].tolist())}")
     else:
         print("Robot failed to reach the goal.")
 
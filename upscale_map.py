@@ -1,5 +1,6 @@
 import os
 import glob
+import numpy as np
 
 def upscale_smart(input_path, scale=4):
     """
@@ -17,43 +18,26 @@ def upscale_smart(input_path, scale=4):
     output_filename = f"{name}_highres{ext}"
     output_path = os.path.join(os.path.dirname(input_path), output_filename)
 
+    # 1. Parse the map into a 2D int8 array of cell values
+    # Assuming space or comma separation (taken from the first non-empty line)
+    delimiter = None
     with open(input_path, 'r') as f:
-        lines = f.readlines()
+        for line in f:
+            if line.strip():
+                delimiter = ',' if ',' in line else None
+                break
+    cells = np.loadtxt(input_path, dtype=np.int8, delimiter=delimiter, ndmin=2)
     
-    new_lines = []
+    # 2. Upscale the rows horizontally (repeat each cell 'scale' times) and join each once
+    # Cells are turned back into text through a 256-entry token table (one lookup per cell)
+    tokens = np.array([str(v) for v in range(-128, 128)], dtype=object)
+    text = tokens[cells.astype(np.int16) + 128]
+    new_rows = [" ".join(row) for row in np.repeat(text, scale, axis=1).tolist()]
     
-    for line in lines:
-        line = line.strip()
-        if not line: continue
-        
-        # 1. Parse line into individual cell tokens
-        # Assuming space or comma separation
-        if ',' in line:
-            delimiter = ','
-        else:
-            delimiter = ' ' # Default to space
-            
-        cells = line.split(delimiter)
-        # Filter out empty strings if multiple spaces existed
-        cells = [c for c in cells if c.strip()]
-        
-        # 2. Upscale the row horizontally
-        # Repeat each cell 'scale' times
-        new_row_cells = []
-        for cell in cells:
-            for _ in range(scale):
-                new_row_cells.append(cell)
-        
-        # Join back into a string
-        new_row_str = " ".join(new_row_cells)
-        
-        # 3. Upscale vertical rows
-        for _ in range(scale):
-            new_lines.append(new_row_str)
-
+    # 3. Upscale vertical rows: every joined row is written 'scale' times
     with open(output_path, 'w') as f:
-        for line in new_lines:
-            f.write(line + "\n")
+        for row in new_rows:
+            f.write((row + "\n") * scale)
             
     print(f"✅ Fixed Upscale: {output_filename}")
 
@@ -0,0 +1,47 @@
+import hashlib
+import os
+import tempfile
+import numpy as np
+
+CACHE_DIR = os.path.join("outputs", "cache")
+
+# Bump when a cached computation changes so stale entries are not reused
+CACHE_VERSION = 2
+
+def cache_key(*parts):
+    """
+    Hashes raw bytes (e.g. a map file) and parameters into a short hex key.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(CACHE_VERSION).encode())
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else repr(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+def load_or_compute(key, compute):
+    """
+    Returns the array cached under `key` (a read-only view of the memory-mapped file).
+    On a miss, calls `compute()`, saves the result and returns it.
+    """
+    path = os.path.join(CACHE_DIR, f"{key}.npy")
+    if os.path.exists(path):
+        try:
+            # Plain ndarray view: per-element indexing on np.memmap is much slower
+            return np.asarray(np.load(path, mmap_mode='r'))
+        except (ValueError, EOFError, OSError):
+            pass  # unreadable/truncated entry: treat as a miss and overwrite it
+
+    result = compute()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Write to a temp file and rename it into place, so an interrupted save
+    # never leaves a truncated entry under the final name
+    fd, tmp_path = tempfile.mkstemp(suffix=".npy.tmp", dir=CACHE_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, result)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return result
@@ -0,0 +1,12 @@
+import numpy as np
+
+def prep_heatmap(field):
+    """
+    Returns a contiguous float32 copy of a potential field ready for imshow.
+    Non-finite cells (obstacles are +inf) are set to the largest finite value
+    so the color scale works.
+    """
+    a = np.asarray(field, dtype=np.float32)
+    finite = np.isfinite(a)
+    max_val = a[finite].max() if finite.any() else 0.0
+    return np.ascontiguousarray(np.where(finite, a, max_val), dtype=np.float32)
@@ -1,26 +1,18 @@
+import matplotlib
+matplotlib.use('Agg')  # file output only: no display server or GUI toolkit needed
 import matplotlib.pyplot as plt
 import numpy as np
 import os
 
+from utils.field_prep import prep_heatmap
+
 def visualize_result(grid, potential_field, path, output_file="output.png"):
     """
     Creates a visualization of the planning result.
     Safe version with explicit type casting.
     """
-    rows = grid.rows
-    cols = grid.cols
-    
-    # 1. Prepare Data for Heatmap
-    # Explicitly cast to float64 to avoid 'object' type errors
-    field_np = np.array(potential_field, dtype=np.float64)
-    
-    # Handle 'inf' values for the heatmap display
-    # We replace 'inf' (obstacles) with the max finite value so the color scale works
-    finite_vals = field_np[np.isfinite(field_np)]
-    if len(finite_vals) > 0:
-        max_val = np.max(finite_vals)
-        # Set inf values slightly higher than max to ensure they are at the top of the color scale
-        field_np[np.isinf(field_np)] = max_val
+    # 1. Prepare Data for Heatmap ('inf' obstacles capped at the max finite value)
+    field_np = prep_heatmap(potential_field)
     
     plt.figure(figsize=(10, 8))
     
@@ -30,11 +22,7 @@ def visualize_result(grid, potential_field, path, output_file="output.png"):
     
     # 3. Overlay Obstacles (Safer Method)
     # Create an array of float64 0s and 1s
-    obs_data = np.zeros((rows, cols), dtype=np.float64)
-    for r in range(rows):
-        for c in range(cols):
-            if grid.get_cell(r, c) == 1:
-                obs_data[r, c] = 1.0
+    obs_data = (np.asarray(grid.grid) == 1).astype(np.float64)
     
     # Mask out the '0's (free space) so they are completely transparent
     masked_obs = np.ma.masked_where(obs_data < 0.5, obs_data)
@@ -44,7 +32,7 @@ def visualize_result(grid, potential_field, path, output_file="output.png"):
     plt.imshow(masked_obs, cmap='gray_r', origin='upper', interpolation='nearest', vmin=0, vmax=1)
 
     # 4. Draw Path
-    if path:
+    if len(path) > 0:
         path_rows, path_cols = zip(*path)
         plt.plot(path_cols, path_rows, color='red', linewidth=2, marker='.', markersize=5, label='Robot Path')
 